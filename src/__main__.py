@@ -1,6 +1,50 @@
-from process import main
-
+import argparse
 import asyncio
 
+from process import CONFIG_FILE_PATH, main
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Process raw movie data and load it into a database")
+    parser.add_argument("--config", default=CONFIG_FILE_PATH,
+                        help="path to the yaml config file")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("run", help="process the input files once (default)")
+    subparsers.add_parser(
+        "watch", help="keep running and process input files as they change")
+
+    export_parser = subparsers.add_parser(
+        "export", help="stream the movie_data table out of the database into files")
+    export_parser.add_argument("--output-dir", dest="output_dir")
+    export_parser.add_argument(
+        "--format", dest="file_format", choices=["csv", "parquet"])
+    export_parser.add_argument(
+        "--compression", help="e.g. gzip, bz2, zstd for csv or snappy, gzip, zstd for parquet, none to disable")
+    export_parser.add_argument("--chunk-size", dest="chunk_size", type=int,
+                               help="rows fetched from the server side cursor per output file")
+    export_parser.add_argument("--workers", type=int,
+                               help="number of output files written in parallel")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+
+    try:
+        if args.command == "watch":
+            from watcher import watch_main
+            asyncio.run(watch_main(args.config))
+        elif args.command == "export":
+            from exporter import export_main
+            overrides = {
+                "output_dir": args.output_dir,
+                "file_format": args.file_format,
+                "compression": args.compression,
+                "chunk_size": args.chunk_size,
+                "workers": args.workers,
+            }
+            asyncio.run(export_main(args.config, overrides))
+        else:
+            asyncio.run(main(args.config))
+    except KeyboardInterrupt:
+        print("- Stopped")
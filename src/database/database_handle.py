@@ -1,9 +1,11 @@
 """
 Module for interfacing with databases and provides tools to bulk load
 """
-from sqlalchemy import create_engine
+from sqlalchemy import select
 from sqlalchemy.orm import sessionmaker
 
+from .engine import get_engine
+
 
 class DatabaseHandle:
     """
@@ -33,7 +35,7 @@ class DatabaseHandle:
                 "Connection string must be provided to the constructor or connect. None was found"
             )
 
-        self.engine = create_engine(con_str)
+        self.engine = get_engine(con_str)
         session = sessionmaker(bind=self.engine)
         self.session = session()
 
@@ -63,6 +65,27 @@ class DatabaseHandle:
             else:
                 self.session.add(database_item)
 
+    def stream_rows(self, model, chunk_size: int = 10000):
+        """
+        Stream every row of a model's table in chunks using a server side cursor,
+        so only one chunk is held in memory at a time
+        :param model: the sqla model whose table is read
+        :param chunk_size: the number of rows fetched per chunk
+        :throws ValueError: if connect has not been called
+        """
+        if self.engine is None:
+            raise ValueError("connect must be called before streaming rows")
+
+        table = model.__table__
+        statement = select(*table.columns).order_by(*table.primary_key.columns)
+
+        with self.engine.connect() as connection:
+            result = connection.execution_options(
+                stream_results=True, yield_per=chunk_size
+            ).execute(statement)
+            for partition in result.mappings().partitions():
+                yield [dict(row) for row in partition]
+
     async def commit(self):
         """
         Commits any staged database changes
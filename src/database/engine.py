@@ -0,0 +1,58 @@
+"""
+Module for creating and sharing database engines
+"""
+import os
+
+from sqlalchemy import create_engine
+
+
+# engines are kept for the lifetime of the process so a resident watcher
+# reuses the same connection pool for every batch it loads
+_ENGINES: dict = {}
+# (connection string, table name) pairs whose tables were already created
+_CREATED_TABLES: set = set()
+
+
+def get_engine(connection_string: str):
+    """
+    Return the engine for a connection string, creating it on first use
+    :param connection_string: the connection string used to connect to a database
+    """
+    engine = _ENGINES.get(connection_string)
+    if engine is None:
+        engine = create_engine(connection_string)
+        _ENGINES[connection_string] = engine
+    return engine
+
+
+def create_tables(connection_string: str, data_model):
+    """
+    Create the model's tables the first time it is loaded through a connection string
+    :param connection_string: the connection string used to connect to a database
+    :param data_model: model class that match the database columns
+    """
+    key = (connection_string, data_model.__tablename__)
+    if key in _CREATED_TABLES:
+        return
+    data_model.base.metadata.create_all(bind=get_engine(connection_string))
+    _CREATED_TABLES.add(key)
+
+
+def build_connection_string() -> str:
+    """
+    Build the database connection string from the DATABASE_* env vars
+    :throws ValueError: if any of the connection values is empty
+    """
+    db_port = os.getenv("DATABASE_PORT", 5432)
+    db_host = os.getenv("DATABASE_HOST", "localhost")
+    db_user = os.getenv("DATABASE_USERNAME", "postgres")
+    db_password = os.getenv("DATABASE_PASSWORD", "admin")
+    db_database = os.getenv("DATABASE_DB", "noname")
+
+    if not (db_host and db_port and db_user and db_password and db_database):
+        raise ValueError(
+            "Database Connection ENV vars need to be set, Got: "
+            + f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_database}"
+        )
+
+    return f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_database}"
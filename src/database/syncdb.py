@@ -1,14 +1,13 @@
 """
 Module functionality for communicating data with the database
 """
-import os
-
 from time import perf_counter
-from sqlalchemy import create_engine, Column, Integer, String, Sequence
+from sqlalchemy import delete, Column, Integer, String, Sequence
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 
+from .engine import build_connection_string, create_tables, get_engine
 from .models.movie_model import MovieModel
 
 
@@ -47,7 +46,7 @@ class Synchronizer:
                 "Connection string must be provided to the constructor or connect. None was found"
             )
 
-        self.engine = create_engine(con_str)
+        self.engine = get_engine(con_str)
         session = sessionmaker(bind=self.engine)
 
         self.session = session()
@@ -63,7 +62,7 @@ class Synchronizer:
 
         self.connect()
 
-        self.data_model.base.metadata.create_all(bind=self.engine)
+        create_tables(self.connection_str, self.data_model)
 
         data_list = []
         if isinstance(data, dict):
@@ -84,6 +83,36 @@ class Synchronizer:
         await self.commit()
         self.session.close()
 
+    async def replace_data(self, batches):
+        """
+        Replace every row of the data model's table with the given batches in a single
+        transaction, so re-loading the same data never collides on the primary key and
+        a failed load leaves the previous rows in place
+        :param batches: an iterable of lists of dicts that match the data model
+        """
+
+        print("- Starting data reload")
+
+        self.connect()
+
+        create_tables(self.connection_str, self.data_model)
+
+        try:
+            self.session.execute(delete(self.data_model))
+            for batch in batches:
+                self.session.add_all(
+                    [self.data_model(**item) for item in batch])
+                self.session.flush()
+
+            print("- Committing data to database")
+
+            await self.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        finally:
+            self.session.close()
+
     async def commit(self):
         """
         Commits any staged database changes
@@ -92,6 +121,21 @@ class Synchronizer:
             self.session.commit()
 
 
+async def replace_main(batches, data_model):
+    """
+    Replace the contents of the data model's table with the given batches
+    :param batches: an iterable of lists of dicts that match the data model
+    :data_model: model class that match the database columns
+    """
+    start_time = perf_counter()
+
+    sync = Synchronizer(build_connection_string(), data_model)
+
+    await sync.replace_data(batches)
+    print(f"- Execution time: {perf_counter() - start_time}")
+    return 0
+
+
 async def create_connection(data: None, data_model: None):
     """
     Create a connection
@@ -100,21 +144,7 @@ async def create_connection(data: None, data_model: None):
     """
     start_time = perf_counter()
 
-    db_port = os.getenv("DATABASE_PORT", 5432)
-    db_host = os.getenv("DATABASE_HOST", "localhost")
-    db_user = os.getenv("DATABASE_USERNAME", "postgres")
-    db_password = os.getenv("DATABASE_PASSWORD", "admin")
-    db_database = os.getenv("DATABASE_DB", "noname")
-
-    if not (db_host and db_port and db_user and db_password and db_database):
-        raise ValueError(
-            "Database Connection ENV vars need to be set, Got: "
-            + f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_database}"
-        )
-
-    database_connection = (
-        f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_database}"
-    )
+    database_connection = build_connection_string()
 
     sync = Synchronizer(database_connection, data_model)
 
@@ -0,0 +1,262 @@
+"""
+Module for streaming tables out of the database into partitioned output files
+"""
+import importlib.util
+import os
+import shutil
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import perf_counter
+
+from sqlalchemy import Boolean, DateTime, Float, Integer
+
+from file_parser import FileParser
+
+
+# file extension added after the format for csv output, parquet compresses internally
+COMPRESSION_EXTENSIONS = {
+    "gzip": ".gz",
+    "bz2": ".bz2",
+    "zip": ".zip",
+    "xz": ".xz",
+    "zstd": ".zst",
+}
+
+# packages outside requirements.txt that pandas needs for some csv codecs
+CSV_COMPRESSION_PACKAGES = {
+    "zstd": "zstandard",
+}
+
+# codecs accepted by pandas/pyarrow for parquet output
+PARQUET_COMPRESSIONS = ["snappy", "gzip", "brotli", "lz4", "zstd"]
+
+
+def column_dtypes(model) -> dict:
+    """
+    Map every column of a model's table to the pandas dtype used for all partitions,
+    so a chunk with nulls or no values in a column is typed like every other chunk
+    :param model: the sqla model whose table is exported
+    return dict of column name to pandas dtype
+    """
+    dtypes = {}
+    for column in model.__table__.columns:
+        if isinstance(column.type, Integer):
+            dtypes[column.name] = "Int64"
+        elif isinstance(column.type, Float):
+            dtypes[column.name] = "Float64"
+        elif isinstance(column.type, Boolean):
+            dtypes[column.name] = "boolean"
+        elif isinstance(column.type, DateTime):
+            dtypes[column.name] = (
+                "datetime64[ns, UTC]" if column.type.timezone else "datetime64[ns]"
+            )
+        else:
+            dtypes[column.name] = "string"
+    return dtypes
+
+
+class Exporter:
+    """
+    Class to stream a model's table from the database in chunks and write each chunk
+    to its own output file. At most `workers` chunks are in flight at a time, so memory
+    use depends on chunk_size and workers but not on the size of the table.
+    """
+
+    def __init__(self, config_dict: dict) -> None:
+        export_info = config_dict.get("export", None) or {}
+        self.output_dir = export_info.get("output_dir", None) or "./export_data"
+        self.file_format = export_info.get("file_format", None) or "csv"
+        self.compression = export_info.get("compression", None)
+        if self.compression == "none":
+            self.compression = None
+        self.chunk_size = export_info.get("chunk_size", None)
+        if self.chunk_size is None:
+            self.chunk_size = 10000
+        self.workers = export_info.get("workers", None)
+        if self.workers is None:
+            self.workers = 1
+
+        self.validate()
+
+    def validate(self):
+        """
+        Check the export settings before any database connection is opened
+        :throws ValueError: if the format, compression, chunk_size or workers are invalid
+        or a package needed for the format or compression is not installed
+        """
+        if self.file_format not in FileParser.output_formats:
+            raise ValueError(
+                f"file_format must be one of {FileParser.output_formats}, got {self.file_format}")
+
+        if self.compression is not None:
+            codecs = (
+                list(COMPRESSION_EXTENSIONS)
+                if self.file_format == "csv"
+                else PARQUET_COMPRESSIONS
+            )
+            if self.compression not in codecs:
+                raise ValueError(
+                    f"compression for {self.file_format} must be one of {codecs} or none, "
+                    f"got {self.compression}")
+
+        required = {}
+        if self.file_format == "parquet":
+            required["parquet export"] = "pyarrow"
+        elif self.compression in CSV_COMPRESSION_PACKAGES:
+            required[f"{self.compression} compression"] = CSV_COMPRESSION_PACKAGES[self.compression]
+        for feature, package in required.items():
+            if importlib.util.find_spec(package) is None:
+                raise ValueError(
+                    f"{feature} requires the {package} package, install it with pip install {package}")
+
+        for name in ["chunk_size", "workers"]:
+            value = getattr(self, name)
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                raise ValueError(
+                    f"{name} must be a positive integer, got {value}")
+
+    def part_path(self, directory: str, table_name: str, part: int) -> str:
+        """
+        Build the output path for one partition
+        :param directory: the directory the partition is written to
+        :param table_name: the name of the exported table
+        :param part: the partition number
+        """
+        file_name = f"{table_name}-{part:05d}.{self.file_format}"
+        if self.file_format == "csv" and self.compression:
+            file_name += COMPRESSION_EXTENSIONS.get(self.compression, "")
+        return os.path.join(directory, file_name)
+
+    def check_output_dir(self, table_name: str):
+        """
+        Make sure output_dir only holds partitions of a previous export of the same table,
+        since it is replaced as a whole once the new export succeeds
+        :param table_name: the name of the exported table
+        :throws ValueError: if output_dir is a file or holds anything else
+        """
+        if not os.path.exists(self.output_dir):
+            return
+        if not os.path.isdir(self.output_dir):
+            raise ValueError(f"output_dir {self.output_dir} is not a directory")
+
+        foreign = [
+            name for name in os.listdir(self.output_dir)
+            if not name.startswith(f"{table_name}-")
+        ]
+        if foreign:
+            raise ValueError(
+                f"output_dir {self.output_dir} contains files that are not {table_name} "
+                f"partitions: {sorted(foreign)[:5]}")
+
+    def replace_output_dir(self, staging_dir: str):
+        """
+        Swap a finished staging directory in place of output_dir, dropping any
+        partitions left over from a previous export
+        :param staging_dir: the directory the new partitions were written to
+        """
+        previous_dir = None
+        if os.path.exists(self.output_dir):
+            previous_dir = staging_dir + ".previous"
+            os.rename(self.output_dir, previous_dir)
+        os.rename(staging_dir, self.output_dir)
+        if previous_dir is not None:
+            shutil.rmtree(previous_dir)
+
+    def write_part(self, output_file_path: str, rows: list, dtypes: dict):
+        """
+        Write a single chunk of rows to disk
+        :param output_file_path: the path to the file to save
+        :param rows: list of dicts for the chunk
+        :param dtypes: column order and pandas dtypes of the output file, see column_dtypes
+        """
+        import pandas as pd
+
+        df = pd.DataFrame.from_records(rows, columns=list(dtypes))
+        for name, dtype in dtypes.items():
+            if dtype.startswith("datetime64"):
+                df[name] = pd.to_datetime(
+                    df[name], utc="UTC" in dtype).astype(dtype)
+            else:
+                df[name] = df[name].astype(dtype)
+        FileParser.write_dataframe(
+            output_file_path, df, self.file_format, self.compression)
+        return len(rows)
+
+    async def export(self, database_handle, model) -> int:
+        """
+        Stream the model's table through a connected DatabaseHandle into partitioned files
+        :param database_handle: a connected database.database_handle.DatabaseHandle
+        :param model: the sqla model whose table is exported
+        return number of rows exported
+        """
+        start_time = perf_counter()
+        table_name = model.__tablename__
+        dtypes = column_dtypes(model)
+
+        self.check_output_dir(table_name)
+        parent_dir = os.path.dirname(os.path.abspath(self.output_dir))
+        if not os.path.exists(parent_dir):
+            os.makedirs(parent_dir)
+
+        print(f"- Exporting {table_name} to {self.output_dir} as {self.file_format}")
+
+        # partitions are written next to output_dir and only moved in place once
+        # every chunk succeeded, so stale or partial exports are never mixed in
+        staging_dir = tempfile.mkdtemp(
+            prefix=f".{os.path.basename(os.path.abspath(self.output_dir))}-", dir=parent_dir)
+        total_rows = 0
+        part = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                pending = set()
+                for rows in database_handle.stream_rows(model, self.chunk_size):
+                    pending.add(executor.submit(
+                        self.write_part, self.part_path(staging_dir, table_name, part), rows, dtypes))
+                    part += 1
+
+                    # block the cursor until a writer frees up so chunks do not pile up in memory
+                    if len(pending) >= self.workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        total_rows += sum(future.result() for future in done)
+
+                done, _ = wait(pending)
+                total_rows += sum(future.result() for future in done)
+
+            # an empty table still gets one partition so the header or schema is written
+            if part == 0:
+                self.write_part(self.part_path(
+                    staging_dir, table_name, part), [], dtypes)
+                part += 1
+
+            self.replace_output_dir(staging_dir)
+        except BaseException:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        elapsed = perf_counter() - start_time
+        rate = total_rows / elapsed if elapsed > 0 else 0
+        print(
+            f"- Exported {total_rows} rows to {part} files in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+        return total_rows
+
+
+async def export_main(config_file_path: str, overrides: dict = None):
+    """
+    Connect to the database and export the movie_data table
+    :param config_file_path: the path to the yaml config
+    :param overrides: export settings that take priority over the config file
+    """
+    from database.database_handle import DatabaseHandle
+    from database.models.movie_model import MovieModel
+    from database.engine import build_connection_string
+
+    config_dict = FileParser.read_yaml(config_file_path)
+    export_info = dict(config_dict.get("export", None) or {})
+    export_info.update(
+        {key: value for key, value in (overrides or {}).items() if value is not None})
+    config_dict["export"] = export_info
+
+    exporter = Exporter(config_dict)
+    database_handle = DatabaseHandle(build_connection_string())
+    await database_handle.connect()
+    await exporter.export(database_handle, MovieModel)
@@ -3,7 +3,6 @@ Module for parsing files
 """
 import csv
 import json
-import pandas as pd
 
 import yaml
 
@@ -14,6 +13,7 @@ class FileParser:
     """
 
     file_extensions = ["json", "yaml", "yml", "csv", "xlsx"]
+    output_formats = ["csv", "parquet"]
 
     def __init__(self, file_path=None, config=None):
 
@@ -85,6 +85,10 @@ class FileParser:
         :param file_path: the path to the file to read
         :param encoding: the encoding to use
         """
+        # pandas is imported lazily so one-shot runs that never touch a csv
+        # do not pay for the import
+        import pandas as pd
+
         try:
             data = pd.read_csv(file_path)
 
@@ -107,15 +111,48 @@ class FileParser:
         return csvfile, writer
 
     @staticmethod
-    def df_to_csv(output_file_path: str, df: None, index: bool = None,  encoding: str = "utf-8"):
+    def df_to_csv(output_file_path: str, df: None, index: bool = None,  encoding: str = "utf-8", compression: str = "infer"):
         """
         convert dataframe to csv and Write a csv file into memory
         :param output_file_path: the path to the file to save
         :param df: pandas dataframe
         :param index: index option
         :param encoding: the encoding to use
+        :param compression: compression passed to pandas, inferred from the extension by default
+        """
+        df.to_csv(output_file_path, index=index,
+                  encoding=encoding, compression=compression)
+
+    @staticmethod
+    def df_to_parquet(output_file_path: str, df: None, index: bool = None, compression: str = "snappy"):
+        """
+        convert dataframe to parquet and write it to disk, requires pyarrow
+        :param output_file_path: the path to the file to save
+        :param df: pandas dataframe
+        :param index: index option
+        :param compression: parquet compression codec, None to disable
+        """
+        df.to_parquet(output_file_path, index=index, compression=compression)
+
+    @staticmethod
+    def write_dataframe(output_file_path: str, df: None, file_format: str, compression: str = None):
         """
-        df.to_csv(output_file_path, index=index, encoding=encoding)
+        Write a dataframe to disk in one of the supported output formats
+        :param output_file_path: the path to the file to save
+        :param df: pandas dataframe
+        :param file_format: one of FileParser.output_formats
+        :param compression: compression to apply, None to write uncompressed
+        :throws ValueError: if the format is not supported
+        """
+        if file_format == "csv":
+            FileParser.df_to_csv(output_file_path, df, False,
+                                 compression=compression)
+        elif file_format == "parquet":
+            FileParser.df_to_parquet(
+                output_file_path, df, False, compression=compression)
+        else:
+            raise ValueError(
+                f"file_format must be one of {FileParser.output_formats}, got {file_format}")
 
     @staticmethod
     def filter_nan_values(df: None):
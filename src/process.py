@@ -1,10 +1,6 @@
-from database.models.movie_model import MovieModel as data_model
-from database.syncdb import sync_main
 from file_parser import FileParser
-import pandas as pd
 import csv
 import asyncio
-import time
 import traceback
 import shutil
 import os
@@ -17,6 +13,9 @@ class ProcessClass:
             config_dict, "persistence_file_path")
         self.create_folder()
         self.batch_size = self.configure_from_dict(config_dict, 'batch_size')
+        # parsed and filtered csv frames keyed by path, reused while the
+        # file's mtime is unchanged
+        self.frame_cache: dict = {}
 
     def configure_from_dict(self, config_dict: dict, config_key: str) -> None:
         """
@@ -32,6 +31,22 @@ class ProcessClass:
             ) from exc
         return props
 
+    def read_cached_csv(self, file_path: str):
+        """
+        Read a csv file into a nan filtered dataframe, reusing the cached
+        frame when the file has not been modified since it was last read
+        :param file_path: the path to the file to read
+        return dataframe
+        """
+        mtime = os.stat(file_path).st_mtime_ns
+        cached = self.frame_cache.get(file_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        df = FileParser.filter_nan_values(FileParser.read_csv(file_path))
+        self.frame_cache[file_path] = (mtime, df)
+        return df
+
     def create_folder(self):
         # Check if the folder already exists
         path = self.download_folder
@@ -48,6 +63,8 @@ class ProcessClass:
         Reads raw genre data from the specified file, processes it, and writes it to a CSV file.
         Raises:
         - Exception: Any unexpected error that occurs during the conversion process.
+        Returns:
+        - bool: False if an error occurred and was printed, True otherwise.
         """
         try:
 
@@ -71,11 +88,13 @@ class ProcessClass:
 
         except Exception as e:
             print(f"An error occurred: {e}")
+            return False
         finally:
             try:
                 csvfile.close()
             except NameError:
                 pass
+        return True
 
     async def convert_year_to_csv(self):
         """
@@ -83,6 +102,8 @@ class ProcessClass:
         Reads raw year data from the specified file, processes it, and writes it to a CSV file.
         Raises:
         - Exception: Any unexpected error that occurs during the conversion process.
+        Returns:
+        - bool: False if an error occurred and was printed, True otherwise.
         """
         try:
             year_info = self.configure_from_dict(
@@ -115,11 +136,13 @@ class ProcessClass:
 
         except Exception as e:
             print(f"An error occurred: {e}")
+            return False
         finally:
             try:
                 csvfile.close()
             except NameError:
                 pass
+        return True
 
     def delete_folder(self, folder_path: str):
         """
@@ -156,20 +179,22 @@ class ProcessClass:
         Raises:
         - Exception: Any unexpected error that occurs during the file combination process.
 
+        Returns:
+        - bool: False if an error occurred and was printed, True otherwise.
+
         """
+        import pandas as pd
+
         try:
             movie_csv = self.configure_from_dict(
                 self.config_dict, "movie_csv")
             combined_info = self.configure_from_dict(
                 self.config_dict, "combine_file")
-            info_df = FileParser.read_csv(movie_csv)
-            info_df = FileParser.filter_nan_values(info_df)
+            info_df = self.read_cached_csv(movie_csv)
 
-            genre_df = FileParser.read_csv(self.genre_csv_file_name)
-            genre_df = FileParser.filter_nan_values(genre_df)
+            genre_df = self.read_cached_csv(self.genre_csv_file_name)
 
-            year_df = FileParser.read_csv(self.year_csv_file_name)
-            year_df = FileParser.filter_nan_values(year_df)
+            year_df = self.read_cached_csv(self.year_csv_file_name)
 
             drop_columns = self.configure_from_dict(
                 combined_info, "drop_columns")
@@ -194,35 +219,58 @@ class ProcessClass:
                 combined_info, "merged_csv")
 
             FileParser.df_to_csv(merged_csv_file_location, merged_df, False)
-            df = pd.read_csv(merged_csv_file_location)
 
         except Exception as e:
             print(f"An error occurred: {e}")
+            return False
+        return True
 
 
 class DatabaseHandle:
     def __init__(self, config_dict) -> None:
         self.config_dict = config_dict
 
-    async def loader(self, data_model):
+    @staticmethod
+    def read_batches(file_path: str, batch_size: int = None):
+        """
+        Read a csv file into lists of row dicts of at most batch_size rows
+        :param file_path: the path to the file to read
+        :param batch_size: rows per batch, the whole file in one batch when empty
+        """
+        batch = []
+        with open(file_path, 'r') as file:
+            data = csv.DictReader(file)
+
+            for row in data:
+                batch.append(row)
+                if batch_size:
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+
+            if len(batch) > 0:
+                yield batch
+
+    async def loader(self, data_model, replace: bool = False):
+        """
+        Load the merged csv into the database
+        :param data_model: model class that match the database columns
+        :param replace: replace the table contents in one transaction instead of appending
+        return True when the load succeeded
+        """
+        from database.syncdb import replace_main, sync_main
+
         try:
             file_info = self.config_dict.get("combine_file", None)
             assert file_info is not None, "combine_file configuration is missing in config_dict"
             file_path = file_info.get("merged_csv", None)
             assert file_path is not None, "merged_csv path is missing in combine_file configuration"
             batch_size = self.config_dict.get("batch_size", None)
-            batch = []
-            with open(file_path, 'r') as file:
-                data = csv.DictReader(file)
-
-                for row in data:
-                    batch.append(row)
-                    if batch_size:
-                        if len(batch) >= batch_size:
-                            await sync_main(batch, data_model)
-                            batch = []
-
-                if len(batch) > 0:
+            batches = self.read_batches(file_path, batch_size)
+            if replace:
+                await replace_main(batches, data_model)
+            else:
+                for batch in batches:
                     await sync_main(batch, data_model)
         except Exception as e:
             if isinstance(e, RuntimeError):
@@ -239,29 +287,57 @@ class DatabaseHandle:
                 print(
                     "-------------------------------End Of Error Track Back---------------------------------"
                 )
+            return False
+        return True
 
-    async def run_loader(self, data_model):
-        await self.loader(data_model)
-    time.sleep(1)
+    async def run_loader(self, data_model, replace: bool = False):
+        return await self.loader(data_model, replace)
 
 
-async def main():
-    CONFIG_FILE_PATH = "./configs/info_config.yaml"
-    config_dict = FileParser.read_yaml(CONFIG_FILE_PATH)
-    process = ProcessClass(config_dict)
+CONFIG_FILE_PATH = "./configs/info_config.yaml"
 
-    try:
-        await asyncio.gather(process.convert_genre_to_csv(), process.convert_year_to_csv())
-        await process.combine_file()
 
-        # db = DatabaseHandle(config_dict)
-        # await db.run_loader(data_model)
+async def run_pipeline(process: ProcessClass, config_dict: dict, convert_genre: bool = True, convert_year: bool = True):
+    """
+    Run the conversion and combine steps with an already configured process.
+    :param process: the ProcessClass instance to run
+    :param config_dict: the loaded config dict
+    :param convert_genre: whether the genre json needs converting again
+    :param convert_year: whether the year json needs converting again
+    return True when every step succeeded
+    """
+    try:
+        conversions = []
+        if convert_genre:
+            conversions.append(process.convert_genre_to_csv())
+        if convert_year:
+            conversions.append(process.convert_year_to_csv())
+        if not all(await asyncio.gather(*conversions)):
+            return False
+        if not await process.combine_file():
+            return False
+
+        if config_dict.get("load_to_database", None):
+            from database.models.movie_model import MovieModel as data_model
+            db = DatabaseHandle(config_dict)
+            # the merged csv is a full snapshot numbered from 1, so it replaces the table
+            if not await db.run_loader(data_model, replace=True):
+                return False
         delete_consume = config_dict.get("delete_consumed_files", None)
         folder_path = config_dict.get("persistence_file_path", None)
         if delete_consume:
             process.delete_folder(folder_path)
     except Exception as e:
         print(f"An error occurred: {e}")
+        return False
+    return True
+
+
+async def main(config_file_path: str = CONFIG_FILE_PATH):
+    config_dict = FileParser.read_yaml(config_file_path)
+    process = ProcessClass(config_dict)
+
+    await run_pipeline(process, config_dict)
 
 
 if __name__ == "__main__":
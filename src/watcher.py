@@ -0,0 +1,130 @@
+"""
+Module for running the pipeline as a resident process that watches the input files
+"""
+import asyncio
+import os
+from time import perf_counter
+
+from file_parser import FileParser
+from process import ProcessClass, run_pipeline
+
+
+class Watcher:
+    """
+    Class to poll the configured input files and re-run the pipeline when they change.
+    The ProcessClass instance, its cached dataframes and any database engine
+    stay in memory between events.
+    """
+
+    def __init__(self, config_dict: dict, process: ProcessClass = None) -> None:
+        self.config_dict = config_dict
+        self.process = process if process is not None else ProcessClass(config_dict)
+
+        watch_info = config_dict.get("watch", None) or {}
+        self.interval = watch_info.get("interval_seconds", None) or 2
+
+        genre_info = self.process.configure_from_dict(config_dict, "genre_data")
+        year_info = self.process.configure_from_dict(config_dict, "year_data")
+        self.watched_paths = {
+            "genre": self.process.configure_from_dict(genre_info, "genre_json"),
+            "year": self.process.configure_from_dict(year_info, "year_json"),
+            "movie": self.process.configure_from_dict(config_dict, "movie_csv"),
+        }
+
+        self.mtimes: dict = {}
+        # running latency counters, kept as scalars so a long lived watcher does not grow
+        self.event_count = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.failed_count = 0
+
+    def snapshot(self) -> dict:
+        """
+        Get the modification time of every watched file, None when a file is missing
+        return dict of watched name to mtime
+        """
+        mtimes = {}
+        for name, path in self.watched_paths.items():
+            try:
+                mtimes[name] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                mtimes[name] = None
+        return mtimes
+
+    def changed_inputs(self, mtimes: dict) -> list:
+        """
+        Compare a snapshot against the last one processed
+        :param mtimes: the snapshot returned by snapshot
+        return list of watched names that were added or modified
+        """
+        return [
+            name for name, mtime in mtimes.items()
+            if mtime is not None and mtime != self.mtimes.get(name)
+        ]
+
+    async def process_event(self, changed: list):
+        """
+        Re-run the pipeline for a set of changed inputs and record its latency,
+        failed runs are counted separately
+        :param changed: the watched names that changed
+        """
+        start_time = perf_counter()
+
+        # consumed files are deleted after each run, so both conversions
+        # have to be redone on every event
+        convert_all = bool(self.config_dict.get("delete_consumed_files", None))
+        if not os.path.exists(self.process.download_folder):
+            self.process.create_folder()
+
+        succeeded = await run_pipeline(
+            self.process,
+            self.config_dict,
+            convert_genre=convert_all or "genre" in changed,
+            convert_year=convert_all or "year" in changed,
+        )
+
+        latency = perf_counter() - start_time
+        if not succeeded:
+            # failed events are kept out of the latency stats
+            self.failed_count += 1
+            print(
+                f"- Event failed: {', '.join(changed)} after {latency:.3f}s "
+                f"({self.failed_count} failed so far)"
+            )
+            return
+
+        self.event_count += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        print(
+            f"- Event {self.event_count}: {', '.join(changed)} processed in {latency:.3f}s "
+            f"(avg {self.total_latency / self.event_count:.3f}s, max {self.max_latency:.3f}s)"
+        )
+
+    async def run(self, max_events: int = None):
+        """
+        Process every input once, then keep polling and process files as they change
+        :param max_events: stop after this many events, runs forever when None
+        """
+        print(f"- Watching {', '.join(self.watched_paths.values())} every {self.interval}s")
+
+        self.mtimes = self.snapshot()
+        await self.process_event(list(self.watched_paths))
+
+        while max_events is None or self.event_count + self.failed_count < max_events:
+            await asyncio.sleep(self.interval)
+            mtimes = self.snapshot()
+            changed = self.changed_inputs(mtimes)
+            if not changed:
+                continue
+            self.mtimes = mtimes
+            await self.process_event(changed)
+
+
+async def watch_main(config_file_path: str):
+    """
+    Load the config once and run the watcher until interrupted
+    :param config_file_path: the path to the yaml config
+    """
+    config_dict = FileParser.read_yaml(config_file_path)
+    await Watcher(config_dict).run()